@@ -13,11 +13,14 @@ def _default_select(_rows, _where=None, **__):
 def _default_insert(_metadata, _table, rows, _values, **__):
     return rows
 
-def _default_update(*_, **__):
-    return 0
+def _default_update(_metadata, _table, rows, *_, **__):
+    return rows, []
 
-def _default_delete(_rows, _where, **__):
-    return 0
+def _default_delete(_metadata, _table, rows, _where, **__):
+    return rows, []
+
+def _default_vacuum(_metadata, _table, rows, **__):
+    return rows, 0
 
 def _default_get_schema(*_, **__):
     return []
@@ -25,10 +28,12 @@ def _default_get_schema(*_, **__):
 _DEFAULT_RETURNS: Dict[str, Callable[..., Any]] = {
     "create_table": _default_create_or_drop,
     "drop_table": _default_create_or_drop,
+    "analyze": _default_create_or_drop,
     "insert": _default_insert,
     "select": _default_select,
     "update": _default_update,
     "delete": _default_delete,
+    "vacuum": _default_vacuum,
     "_get_schema": _default_get_schema,
     "list_tables": lambda *_a, **_k: [],
 }
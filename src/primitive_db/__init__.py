@@ -0,0 +1,3 @@
+from .api import Connection, Cursor, connect
+
+__all__ = ["Connection", "Cursor", "connect"]
@@ -0,0 +1,336 @@
+import contextlib
+import io
+import os
+import shlex
+from inspect import unwrap
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import core
+from .parser import (
+    PLACEHOLDER,
+    parse_delete,
+    parse_insert,
+    parse_select,
+    parse_update,
+    parse_vacuum,
+)
+from .utils import (
+    delete_table_data,
+    export_rows,
+    load_metadata,
+    load_table_data,
+    save_metadata,
+    save_table_data,
+)
+
+META_FILE = "db_meta.json"
+DATA_SUBDIR = "data"
+
+# Функции core без декораторов: без печати времени и сообщений об ошибках,
+# без запроса подтверждения — исключения пробрасываются вызывающему коду.
+_create_table = unwrap(core.create_table)
+_drop_table = unwrap(core.drop_table)
+_insert = unwrap(core.insert)
+_update = unwrap(core.update)
+_delete = unwrap(core.delete)
+_vacuum = unwrap(core.vacuum)
+
+
+def _bind(values: Iterable[Any], params: Iterator[Any]) -> List[Any]:
+    result: List[Any] = []
+    for v in values:
+        if v is PLACEHOLDER:
+            try:
+                v = next(params)
+            except StopIteration:
+                raise ValueError("Недостаточно параметров для запроса") from None
+        result.append(v)
+    return result
+
+
+def _bind_dict(
+    clause: Optional[Dict[str, Any]],
+    params: Iterator[Any],
+) -> Optional[Dict[str, Any]]:
+    if clause is None:
+        return None
+    return dict(zip(clause.keys(), _bind(clause.values(), params)))
+
+
+def _parse(sql: str) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Разобрать команду один раз; значения "?" остаются PLACEHOLDER.
+    """
+    cmd = sql.strip().split(None, 1)[0].lower() if sql.strip() else ""
+    match cmd:
+        case "select":
+            return cmd, parse_select(sql)
+        case "insert":
+            return cmd, parse_insert(sql)
+        case "update":
+            return cmd, parse_update(sql)
+        case "delete":
+            return cmd, parse_delete(sql)
+        case "vacuum":
+            return cmd, (parse_vacuum(sql),)
+        case "create_table" | "drop_table":
+            tokens = shlex.split(sql)
+            return cmd, (tokens[1:],)
+    raise ValueError(f"Неподдерживаемая команда: {sql!r}")
+
+
+class Cursor:
+    """
+    Курсор в стиле DB-API: execute/executemany, fetchone/fetchmany/fetchall.
+    Результат select отдаётся лениво — курсор можно итерировать.
+    """
+
+    arraysize = 1
+
+    def __init__(self, connection: "Connection") -> None:
+        self.connection = connection
+        self.description: Optional[List[Tuple[str, ...]]] = None
+        self.rowcount = -1
+        self.lastrowid: Optional[int] = None
+        self._rows: Iterator[Tuple[Any, ...]] = iter(())
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> "Cursor":
+        conn = self.connection
+        cmd, parsed = conn._parse_cached(sql)
+        it = iter(params)
+        self.description = None
+        self.rowcount = -1
+        self._rows = iter(())
+
+        match cmd:
+            case "select":
+                table_name, where, order_by, limit, into = parsed
+                where = _bind_dict(where, it)
+                (limit,) = _bind([limit], it)
+                self._check_params(it)
+                self._select(table_name, where, order_by, limit, into)
+            case "insert":
+                table_name, values = parsed
+                values = _bind(values, it)
+                self._check_params(it)
+                data = conn._table(table_name)
+                _, self.lastrowid = _insert(conn.metadata, table_name, values, data)
+                conn._dirty.add(table_name)
+                self.rowcount = 1
+            case "update":
+                table_name, set_clause, where = parsed
+                set_clause = _bind_dict(set_clause, it)
+                where = _bind_dict(where, it)
+                self._check_params(it)
+                data = conn._table(table_name)
+                _, updated_ids = _update(conn.metadata, table_name, data,
+                                         set_clause, where)
+                conn._dirty.add(table_name)
+                self.rowcount = len(updated_ids)
+            case "delete":
+                table_name, where = parsed
+                where = _bind_dict(where, it)
+                self._check_params(it)
+                data = conn._table(table_name)
+                _, deleted_ids = _delete(conn.metadata, table_name, data, where)
+                if core.needs_vacuum(conn.metadata, table_name, data):
+                    conn._vacuum(table_name)
+                conn._dirty.add(table_name)
+                self.rowcount = len(deleted_ids)
+            case "vacuum":
+                (table_name,) = parsed
+                self.rowcount = conn._vacuum(table_name)
+            case "create_table":
+                (args,) = parsed
+                conn._create_table(args)
+            case "drop_table":
+                (args,) = parsed
+                conn._drop_table(args)
+        return self
+
+    def executemany(
+        self,
+        sql: str,
+        seq_of_params: Iterable[Sequence[Any]],
+    ) -> "Cursor":
+        total = 0
+        for params in seq_of_params:
+            self.execute(sql, params)
+            total += max(self.rowcount, 0)
+        self.rowcount = total
+        return self
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        return next(self._rows, None)
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Tuple[Any, ...]]:
+        return list(islice(self._rows, size or self.arraysize))
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        return list(self._rows)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return self._rows
+
+    def close(self) -> None:
+        self._rows = iter(())
+
+    @staticmethod
+    def _check_params(it: Iterator[Any]) -> None:
+        if next(it, PLACEHOLDER) is not PLACEHOLDER:
+            raise ValueError("Передано больше параметров, чем указано в запросе")
+
+    def _select(
+        self,
+        table_name: str,
+        where: Optional[Dict[str, Any]],
+        order_by: Optional[Tuple[str, bool]],
+        limit: Optional[int],
+        into: Optional[str],
+    ) -> None:
+        conn = self.connection
+        headers = conn._field_order(table_name)
+        if order_by and order_by[0] not in headers:
+            raise ValueError(f'Неизвестное поле "{order_by[0]}"')
+        rows = core.iter_select(conn._table(table_name), where,
+                                conn._stats(table_name), order_by, limit)
+        if into:
+            self.rowcount = export_rows(into, rows, headers)
+            return
+        self.description = [(h, None, None, None, None, None, None) for h in headers]
+        self._rows = (tuple(rec.get(h) for h in headers) for rec in rows)
+
+
+class Connection:
+    """
+    Соединение с базой в каталоге path (db_meta.json и data/).
+    Метаданные и прочитанные таблицы остаются в памяти между запросами;
+    изменения записываются на диск при commit().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._meta_path = os.path.join(path, META_FILE)
+        self._data_dir = os.path.join(path, DATA_SUBDIR)
+        self._statements: Dict[str, Tuple[str, Tuple[Any, ...]]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        self.metadata: Dict[str, Any] = load_metadata(self._meta_path)
+        self.metadata.setdefault("tables", {})
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._dirty: set = set()
+        self._dropped: set = set()
+        self._meta_dirty = False
+
+    def cursor(self) -> Cursor:
+        return Cursor(self)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> Cursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(
+        self,
+        sql: str,
+        seq_of_params: Iterable[Sequence[Any]],
+    ) -> Cursor:
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        for table_name in self._dropped - self._dirty:
+            delete_table_data(table_name, self._data_dir)
+        for table_name in self._dirty:
+            if table_name in self.metadata["tables"]:
+                save_table_data(table_name, self._tables[table_name],
+                                self._data_dir)
+        if self._dirty or self._meta_dirty:
+            save_metadata(self._meta_path, self.metadata)
+        self._dirty.clear()
+        self._dropped.clear()
+        self._meta_dirty = False
+
+    def rollback(self) -> None:
+        self._load()
+
+    def close(self) -> None:
+        """
+        Закрыть соединение; незафиксированные изменения отбрасываются.
+        """
+        self._load()
+
+    def __enter__(self) -> "Connection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def _parse_cached(self, sql: str) -> Tuple[str, Tuple[Any, ...]]:
+        parsed = self._statements.get(sql)
+        if parsed is None:
+            parsed = self._statements[sql] = _parse(sql)
+        return parsed
+
+    def _check_table(self, table_name: str) -> None:
+        if table_name not in self.metadata["tables"]:
+            raise ValueError(f'Таблица "{table_name}" не существует')
+
+    def _table(self, table_name: str) -> List[Dict[str, Any]]:
+        self._check_table(table_name)
+        data = self._tables.get(table_name)
+        if data is None:
+            data = self._tables[table_name] = load_table_data(
+                table_name, self._data_dir
+            )
+        return data
+
+    def _stats(self, table_name: str) -> Any:
+        return self.metadata["tables"][table_name].get("stats")
+
+    def _field_order(self, table_name: str) -> List[str]:
+        self._check_table(table_name)
+        structure = self.metadata["tables"][table_name]["structure"]
+        return [c["name"] for c in structure]
+
+    def _vacuum(self, table_name: str) -> int:
+        data, removed = _vacuum(self.metadata, table_name, self._table(table_name))
+        self._tables[table_name] = data
+        self._dirty.add(table_name)
+        return removed
+
+    def _create_table(self, args: List[str]) -> None:
+        if len(args) < 2:
+            raise ValueError("Ожидались имя таблицы и столбцы")
+        table_name, columns = args[0], args[1:]
+        if table_name in self.metadata["tables"]:
+            raise ValueError(f'Таблица "{table_name}" уже существует')
+        # create_table сообщает об успехе через print — в API это не нужно.
+        with contextlib.redirect_stdout(io.StringIO()):
+            _create_table(self.metadata, table_name, columns)
+        # Новая таблица записывается при commit — пустой файл заменит
+        # данные таблицы с тем же именем, если она была удалена.
+        self._tables[table_name] = []
+        self._dirty.add(table_name)
+        self._meta_dirty = True
+
+    def _drop_table(self, args: List[str]) -> None:
+        if len(args) != 1:
+            raise ValueError("Ожидалось имя таблицы")
+        self._check_table(args[0])
+        with contextlib.redirect_stdout(io.StringIO()):
+            _drop_table(self.metadata, args[0])
+        self._tables.pop(args[0], None)
+        self._dirty.discard(args[0])
+        self._dropped.add(args[0])
+        self._meta_dirty = True
+
+
+def connect(path: str) -> Connection:
+    """
+    Открыть базу данных в каталоге path (создаётся при первом commit).
+    """
+    return Connection(path)
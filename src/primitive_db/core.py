@@ -1,9 +1,29 @@
-from typing import Any, Dict, List, Optional, Tuple
-
-from decorators import confirm_action, create_cacher, handle_errors, log_time
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..decorators import confirm_action, handle_errors, log_time
+from .sorting import sort_rows
+from .stats import (
+    build_stats,
+    plan_where,
+    stats_on_delete,
+    stats_on_insert,
+    stats_on_update,
+)
 
 ALLOWED_TYPES: Dict[str, type] = {"int": int, "str": str, "bool": bool}
 
+# Сортировка результата: (столбец, по_убыванию).
+OrderBy = Tuple[str, bool]
+
+# Удалённая запись остаётся в данных таблицы как {"ID": ..., TOMBSTONE: True},
+# пока её не уберёт vacuum.
+TOMBSTONE = "__deleted__"
+# Автоматический vacuum: доля удалённых записей и минимальное их число.
+VACUUM_THRESHOLD = 0.3
+VACUUM_MIN_DEAD = 100
+
 
 def normalize_columns(columns: List[str]) -> List[Tuple[str, str]]:
     """
@@ -81,6 +101,16 @@ def _cast_to_type(value: Any, type_name: str) -> Any:
     raise ValueError(f"Ожидался тип {type_name}, получено: {value!r}")
 
 
+def _mark_dirty(metadata: Dict[str, Any], table_name: str) -> None:
+    """
+    Отметить метаданные таблицы изменёнными: каталог (TableCatalog)
+    запишет при save_metadata только отмеченные таблицы.
+    """
+    mark_dirty = getattr(metadata["tables"], "mark_dirty", None)
+    if mark_dirty is not None:
+        mark_dirty(table_name)
+
+
 @handle_errors
 def create_table(
     metadata: Dict[str, Any],
@@ -101,7 +131,10 @@ def create_table(
 
     parsed_with_id = [("ID", "int")] + parsed
     table_structure = [{"name": n, "type": t} for n, t in parsed_with_id]
-    metadata["tables"][table_name] = {"structure": table_structure}
+    metadata["tables"][table_name] = {
+        "structure": table_structure,
+        "stats": build_stats(parsed_with_id, []),
+    }
 
     cols_str = ", ".join(f"{n}:{t}" for n, t in parsed_with_id)
     print(f'Таблица "{table_name}" успешно создана со столбцами: {cols_str}')
@@ -139,10 +172,14 @@ def help() -> None:
         "<command> list_tables - показать список всех таблиц\n"
         "<command> drop_table <имя_таблицы> - удалить таблицу\n"
         "<command> insert into <имя_таблицы> values (<значение1>, <значение2>, ...) - создать запись\n"                                 # NOQA E501
-        "<command> select from <имя_таблицы> [where <столбец> = <значение>] - прочитать записи\n"                                       # NOQA E501
+        "<command> select from <имя_таблицы> [where <столбец> = <значение> [and ...]] [order by <столбец> [asc|desc]] [limit <n>] - прочитать записи\n"  # NOQA E501
         "<command> update <имя_таблицы> set <столбец1> = <новое_значение1>[, ...] where <столбец> = <значение> - обновить запись(и)\n"  # NOQA E501
         "<command> delete from <имя_таблицы> where <столбец> = <значение> - удалить запись(и)\n"                                        # NOQA E501
+        "<command> select from <имя_таблицы> [where ...] into '<файл.csv|файл.jsonl>' - выгрузить записи в файл\n"                      # NOQA E501
+        "<command> export <имя_таблицы> '<файл.csv|файл.jsonl>' - выгрузить таблицу в файл\n"                                           # NOQA E501
         "<command> info <имя_таблицы> - информация о таблице\n"
+        "<command> vacuum <имя_таблицы> - физически удалить помеченные записи\n"
+        "<command> analyze <имя_таблицы> - пересчитать статистику столбцов\n"
         "<command> exit - выход из программы\n"
         "<command> help - справочная информация"
     )
@@ -173,38 +210,146 @@ def insert(
     for (col_name, col_type), raw_val in zip(non_id_schema, values):
         casted[col_name] = _cast_to_type(raw_val, col_type)
 
-    new_id = 1
-    if table_data:
-        max_id = max(int(rec.get("ID", 0)) for rec in table_data)
-        new_id = max_id + 1
+    # Записи упорядочены по ID, поэтому максимальный ID — у последней.
+    new_id = int(table_data[-1]["ID"]) + 1 if table_data else 1
 
     record = {"ID": new_id, **casted}
     table_data.append(record)
+    stats_on_insert(metadata["tables"][table_name].get("stats"), record)
+    _mark_dirty(metadata, table_name)
     return table_data, new_id
 
 
+def _is_live(rec: Dict[str, Any]) -> bool:
+    return TOMBSTONE not in rec
+
+
+def _match(rec: Dict[str, Any], predicates: List[Tuple[str, Any]]) -> bool:
+    if TOMBSTONE in rec:
+        return False
+    for k, v in predicates:
+        if k not in rec:
+            return False
+        if rec[k] != v:
+            return False
+        # True == 1 в Python, но в СУБД bool и int — разные типы: без этой
+        # проверки результат зависел бы от выбранного по статистике пути.
+        if isinstance(rec[k], bool) != isinstance(v, bool):
+            return False
+    return True
+
+
+def _find_by_id(
+    table_data: List[Dict[str, Any]],
+    record_id: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Бинарный поиск записи по ID: insert добавляет записи с растущим ID в конец,
+    поэтому данные таблицы всегда упорядочены по ID.
+    """
+    i = bisect_left(table_data, record_id, key=lambda rec: rec["ID"])
+    if i < len(table_data) and table_data[i]["ID"] == record_id:
+        return [table_data[i]]
+    return []
+
+
 @log_time
 @handle_errors
-@create_cacher
 def select(
     table_data: List[Dict[str, Any]],
     where_clause: Optional[Dict[str, Any]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    order_by: Optional[OrderBy] = None,
+    limit: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     Возвращает все записи или фильтрует по where_clause (равенство, AND).
+    Если передана статистика таблицы, путь доступа и порядок проверки условий
+    выбираются по оценке селективности. order_by и limit — как в iter_select.
     """
+    if order_by is not None or limit is not None:
+        return list(iter_select(table_data, where_clause, stats, order_by, limit))
     if not where_clause:
-        return list(table_data)
+        return [rec for rec in table_data if _is_live(rec)]
+    return _find(table_data, where_clause, stats)
 
-    def match(rec: Dict[str, Any]) -> bool:
-        for k, v in where_clause.items():
-            if k not in rec:
-                return False
-            if rec[k] != v:
-                return False
-        return True
 
-    return [rec for rec in table_data if match(rec)]
+def _find(
+    table_data: List[Dict[str, Any]],
+    where_clause: Dict[str, Any],
+    stats: Optional[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Найти живые записи по where_clause, выбрав путь доступа по статистике.
+    """
+    plan = plan_where(stats, where_clause, len(table_data))
+    predicates = plan["predicates"]
+    if plan["path"] == "empty":
+        return []
+    if plan["path"] == "id_lookup":
+        candidates = _find_by_id(table_data, where_clause["ID"])
+        return [rec for rec in candidates if _match(rec, predicates)]
+    return [rec for rec in table_data if _match(rec, predicates)]
+
+
+def iter_select(
+    rows: Iterable[Dict[str, Any]],
+    where_clause: Optional[Dict[str, Any]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    order_by: Optional[OrderBy] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Потоковый вариант select: лениво отдаёт подходящие записи из rows,
+    не собирая результат в список.
+
+    Сортировка по ID использует порядок хранения (записи упорядочены по ID);
+    по другим столбцам — sort_rows: куча для order_by + limit, иначе внешняя
+    сортировка с временными файлами для больших результатов.
+    """
+    if order_by is not None and order_by[0] == "ID":
+        descending = order_by[1]
+        if not descending:
+            order_by = None
+        elif isinstance(rows, list) and not (where_clause and "ID" in where_clause):
+            rows = reversed(rows)
+            order_by = None
+
+    matched = _iter_matching(rows, where_clause, stats)
+    if order_by is not None:
+        return sort_rows(matched, order_by[0], order_by[1], limit)
+    if limit is not None:
+        return islice(matched, limit)
+    return matched
+
+
+def _iter_matching(
+    rows: Iterable[Dict[str, Any]],
+    where_clause: Optional[Dict[str, Any]],
+    stats: Optional[Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    if not where_clause:
+        yield from filter(_is_live, rows)
+        return
+
+    # Длина известна только у списка; для потока "empty" не выбирается.
+    stored_rows = len(rows) if isinstance(rows, list) else None
+    plan = plan_where(stats, where_clause, stored_rows)
+    predicates = plan["predicates"]
+    if plan["path"] == "empty":
+        return
+    target_id = None
+    if plan["path"] == "id_lookup":
+        value = where_clause["ID"]
+        # Ранний выход только для int: с другими типами сравнение упадёт.
+        if isinstance(value, int) and not isinstance(value, bool):
+            target_id = value
+    for rec in rows:
+        if target_id is not None and rec["ID"] > target_id:
+            # Записи упорядочены по ID — дальше совпадений нет.
+            return
+        if _match(rec, predicates):
+            yield rec
 
 
 @handle_errors
@@ -220,55 +365,93 @@ def update(
     Возвращает (обновлённые_данные, список_ID_обновлённых).
     """
     schema = dict(_schema_for_table(metadata, table_name))  # name -> type
+    stats = metadata["tables"][table_name].get("stats")
     updated_ids: List[int] = []
 
-    for rec in table_data:
-        is_match = True
-        for k, v in where_clause.items():
-            if rec.get(k) != v:
-                is_match = False
-                break
-        if not is_match:
-            continue
-
-        # Обновление с валидацией типа
-        for k, v in set_clause.items():
-            if k == "ID":
-                raise ValueError("Нельзя изменять поле ID")
-            if k not in schema:
-                raise ValueError(f'Неизвестное поле "{k}"')
-            rec[k] = _cast_to_type(v, schema[k])
+    # Валидация и приведение типов до изменения записей: ошибка в одном
+    # из значений не должна оставить запись изменённой наполовину.
+    casted: Dict[str, Any] = {}
+    for k, v in set_clause.items():
+        if k == "ID":
+            raise ValueError("Нельзя изменять поле ID")
+        if k not in schema:
+            raise ValueError(f'Неизвестное поле "{k}"')
+        casted[k] = _cast_to_type(v, schema[k])
+
+    for rec in _find(table_data, where_clause, stats):
+        stats_on_update(stats, rec, casted)
+        rec.update(casted)
         updated_ids.append(int(rec["ID"]))
 
+    if updated_ids:
+        _mark_dirty(metadata, table_name)
     return table_data, updated_ids
 
 
 @confirm_action("удаление записей")
 @handle_errors
 def delete(
+    metadata: Dict[str, Any],
+    table_name: str,
     table_data: List[Dict[str, Any]],
     where_clause: Dict[str, Any],
 ) -> Tuple[List[Dict[str, Any]], List[int]]:
     """
-    Удаляет записи по where_clause.
-    Возвращает (обновлённые_данные, список_ID_удалённых).
+    Помечает записи по where_clause как удалённые (на месте, без копирования
+    таблицы). Возвращает (данные, список_ID_удалённых).
     """
-    remaining: List[Dict[str, Any]] = []
+    table_meta = metadata["tables"][table_name]
+    stats = table_meta.get("stats")
     deleted_ids: List[int] = []
 
-    for rec in table_data:
-        is_match = True
-        for k, v in where_clause.items():
-            if rec.get(k) != v:
-                is_match = False
-                break
-        if is_match:
-            if "ID" in rec:
-                deleted_ids.append(int(rec["ID"]))
-            continue
-        remaining.append(rec)
+    for rec in _find(table_data, where_clause, stats):
+        record_id = rec["ID"]
+        stats_on_delete(stats, rec)
+        rec.clear()
+        rec["ID"] = record_id
+        rec[TOMBSTONE] = True
+        deleted_ids.append(int(record_id))
+
+    if deleted_ids:
+        table_meta["dead_rows"] = table_meta.get("dead_rows", 0) + len(deleted_ids)
+        _mark_dirty(metadata, table_name)
+    return table_data, deleted_ids
 
-    return remaining, deleted_ids
+
+def needs_vacuum(
+    metadata: Dict[str, Any],
+    table_name: str,
+    table_data: List[Dict[str, Any]],
+) -> bool:
+    """
+    Пора ли сжимать таблицу: удалённых записей достаточно много
+    и их доля не меньше VACUUM_THRESHOLD.
+    """
+    dead = metadata["tables"][table_name].get("dead_rows", 0)
+    return dead >= VACUUM_MIN_DEAD and dead >= VACUUM_THRESHOLD * len(table_data)
+
+
+@handle_errors
+def vacuum(
+    metadata: Dict[str, Any],
+    table_name: str,
+    table_data: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Физически удаляет помеченные записи.
+    Возвращает (сжатые_данные, число_убранных_записей).
+    """
+    _schema_for_table(metadata, table_name)
+    live = [rec for rec in table_data if _is_live(rec)]
+    removed = len(table_data) - len(live)
+    table_meta = metadata["tables"][table_name]
+    table_meta["dead_rows"] = 0
+    stats = table_meta.get("stats")
+    # Статистику, которая уже не совпадала с данными, не выдаём за точную.
+    if stats is not None and stats.get("stored_rows") == len(table_data):
+        stats["stored_rows"] = len(live)
+    _mark_dirty(metadata, table_name)
+    return live, removed
 
 
 def table_info(
@@ -281,4 +464,23 @@ def table_info(
     """
     schema = _schema_for_table(metadata, table_name)
     cols_str = ", ".join(f"{n}:{t}" for n, t in schema)
-    return cols_str, len(table_data)
+    dead = metadata["tables"][table_name].get("dead_rows", 0)
+    return cols_str, len(table_data) - dead
+
+
+@handle_errors
+def analyze(
+    metadata: Dict[str, Any],
+    table_name: str,
+    table_data: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Пересчитать статистику столбцов таблицы по её текущим данным.
+    """
+    schema = _schema_for_table(metadata, table_name)
+    live = [rec for rec in table_data if _is_live(rec)]
+    metadata["tables"][table_name]["stats"] = build_stats(
+        schema, live, len(table_data)
+    )
+    _mark_dirty(metadata, table_name)
+    return metadata
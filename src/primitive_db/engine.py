@@ -1,30 +1,46 @@
 # src/primitive_db/engine.py
 import shlex
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from prettytable import PrettyTable
 
+from ..decorators import create_cacher
 from .core import (
+    analyze,
     create_table,
     delete,
     drop_table,
     insert,
+    iter_select,
     list_tables,
+    needs_vacuum,
     select,
     table_info,
     update,
+    vacuum,
 )
 from .core import (
     help as print_help,
 )
 from .parser import (
+    parse_analyze,
     parse_delete,
+    parse_export,
     parse_info,
     parse_insert,
     parse_select,
     parse_update,
+    parse_vacuum,
+)
+from .utils import (
+    delete_table_data,
+    export_rows,
+    iter_table_data,
+    load_metadata,
+    load_table_data,
+    save_metadata,
+    save_table_data,
 )
-from .utils import load_metadata, load_table_data, save_metadata, save_table_data
 
 META_PATH = "db_meta.json"
 
@@ -45,6 +61,10 @@ def _field_order(metadata: Dict[str, Any], table_name: str) -> List[str]:
     return [c["name"] for c in structure]
 
 
+def _table_stats(metadata: Dict[str, Any], table_name: str) -> Any:
+    return metadata["tables"][table_name].get("stats")
+
+
 def _print_table(rows: List[Dict[str, Any]], headers: List[str]) -> None:
     table = PrettyTable()
     table.field_names = headers
@@ -53,11 +73,33 @@ def _print_table(rows: List[Dict[str, Any]], headers: List[str]) -> None:
     print(table)
 
 
+def _export(
+    metadata: Dict[str, Any],
+    table_name: str,
+    where: Optional[Dict[str, Any]],
+    filepath: str,
+    order_by: Optional[Tuple[str, bool]] = None,
+    limit: Optional[int] = None,
+) -> None:
+    """
+    Потоково выгрузить подходящие записи таблицы в CSV/JSONL-файл.
+    """
+    rows = iter_select(iter_table_data(table_name), where,
+                       _table_stats(metadata, table_name), order_by, limit)
+    try:
+        count = export_rows(filepath, rows, _field_order(metadata, table_name))
+    except (ValueError, OSError) as exc:
+        print(f"Ошибка: {exc}")
+        return
+    print(f'Выгружено записей: {count} в файл "{filepath}".')
+
+
 def run() -> None:
     """
     Основной цикл: загрузка метаданных, чтение команд, обработка и сохранение.
     """
     metadata = load_metadata(META_PATH)
+    select_cache = create_cacher()
     print("База данных запущена. Введите команду. help для справки.")
 
     while True:
@@ -110,8 +152,13 @@ def run() -> None:
                           "Попробуйте снова.")
                     continue
                 table_name = tokens[1]
+                existed = table_name in metadata.get("tables", {})
                 metadata = drop_table(metadata, table_name)
                 save_metadata(META_PATH, metadata)
+                # Иначе новая таблица с тем же именем получит старые записи.
+                if existed and table_name not in metadata["tables"]:
+                    delete_table_data(table_name)
+                select_cache = create_cacher()
                 continue
 
             case "list_tables":
@@ -119,30 +166,55 @@ def run() -> None:
                 _print_list(names)
                 continue
             case "insert":
-                table_name, values = parse_insert(user_input)
+                try:
+                    table_name, values = parse_insert(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
                 if "tables" not in metadata or table_name not in metadata["tables"]:
                     print(f'Ошибка: Таблица "{table_name}" не существует.')
                     continue
                 data = load_table_data(table_name)
                 data, new_id = insert(metadata, table_name, values, data)
                 save_table_data(table_name, data)
+                save_metadata(META_PATH, metadata)
+                select_cache = create_cacher()
                 print(f'Запись с ID={new_id} успешно добавлена в таблицу '
                       '"{table_name}".')
                 continue
 
-            case "select ":
-                table_name, where = parse_select(user_input)
+            case "select":
+                try:
+                    table_name, where, order_by, limit, into = parse_select(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
                 if "tables" not in metadata or table_name not in metadata["tables"]:
                     print(f'Ошибка: Таблица "{table_name}" не существует.')
                     continue
-                data = load_table_data(table_name)
-                rows = select(data, where)
                 headers = _field_order(metadata, table_name)
+                if order_by and order_by[0] not in headers:
+                    print(f'Ошибка: Неизвестное поле "{order_by[0]}"')
+                    continue
+                if into:
+                    _export(metadata, table_name, where, into, order_by, limit)
+                    continue
+                where_key = tuple(sorted(where.items())) if where else None
+                rows = select_cache(
+                    (table_name, where_key, order_by, limit),
+                    lambda: select(load_table_data(table_name), where,
+                                   _table_stats(metadata, table_name),
+                                   order_by, limit),
+                )
                 _print_table(rows, headers)
                 continue
 
-            case "update ":
-                table_name, set_clause, where = parse_update(user_input)
+            case "update":
+                try:
+                    table_name, set_clause, where = parse_update(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
                 if "tables" not in metadata or table_name not in metadata["tables"]:
                     print(f'Ошибка: Таблица "{table_name}" не существует.')
                     continue
@@ -150,6 +222,8 @@ def run() -> None:
                 data, updated_ids = update(metadata, table_name, 
                                            data, set_clause, where)
                 save_table_data(table_name, data)
+                save_metadata(META_PATH, metadata)
+                select_cache = create_cacher()
                 if len(updated_ids) == 1:
                     print(f'Запись с ID={updated_ids[0]} в таблице "{table_name}" '
                           'успешно обновлена.')
@@ -157,14 +231,22 @@ def run() -> None:
                     print(f"Обновлено записей: {len(updated_ids)}")
                 continue
 
-            case "delete ":
-                table_name, where = parse_delete(user_input)
+            case "delete":
+                try:
+                    table_name, where = parse_delete(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
                 if "tables" not in metadata or table_name not in metadata["tables"]:
                     print(f'Ошибка: Таблица "{table_name}" не существует.')
                     continue
                 data = load_table_data(table_name)
-                data, deleted_ids = delete(data, where)
+                data, deleted_ids = delete(metadata, table_name, data, where)
+                if needs_vacuum(metadata, table_name, data):
+                    data, _ = vacuum(metadata, table_name, data)
                 save_table_data(table_name, data)
+                save_metadata(META_PATH, metadata)
+                select_cache = create_cacher()
                 if len(deleted_ids) == 1:
                     print(f'Запись с ID={deleted_ids[0]} успешно удалена из таблицы '
                           '"{table_name}".')
@@ -172,8 +254,12 @@ def run() -> None:
                     print(f"Удалено записей: {len(deleted_ids)}")
                 continue
 
-            case "info ":
-                table_name = parse_info(user_input)
+            case "info":
+                try:
+                    table_name = parse_info(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
                 if "tables" not in metadata or table_name not in metadata["tables"]:
                     print(f'Ошибка: Таблица "{table_name}" не существует.')
                     continue
@@ -184,6 +270,50 @@ def run() -> None:
                 print(f"Количество записей: {count}")
                 continue
 
+            case "export":
+                try:
+                    table_name, filepath = parse_export(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
+                if "tables" not in metadata or table_name not in metadata["tables"]:
+                    print(f'Ошибка: Таблица "{table_name}" не существует.')
+                    continue
+                _export(metadata, table_name, None, filepath)
+                continue
+
+            case "vacuum":
+                try:
+                    table_name = parse_vacuum(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
+                if "tables" not in metadata or table_name not in metadata["tables"]:
+                    print(f'Ошибка: Таблица "{table_name}" не существует.')
+                    continue
+                data = load_table_data(table_name)
+                data, removed = vacuum(metadata, table_name, data)
+                save_table_data(table_name, data)
+                save_metadata(META_PATH, metadata)
+                print(f'Таблица "{table_name}" сжата, убрано записей: {removed}.')
+                continue
+
+            case "analyze":
+                try:
+                    table_name = parse_analyze(user_input)
+                except ValueError as exc:
+                    print(f"Некорректное значение: {exc}. Попробуйте снова.")
+                    continue
+                if "tables" not in metadata or table_name not in metadata["tables"]:
+                    print(f'Ошибка: Таблица "{table_name}" не существует.')
+                    continue
+                data = load_table_data(table_name)
+                metadata = analyze(metadata, table_name, data)
+                save_metadata(META_PATH, metadata)
+                select_cache = create_cacher()
+                print(f'Статистика таблицы "{table_name}" обновлена.')
+                continue
+
         print(f"Функции {cmd} нет. Попробуйте снова.")
 
     print("Выход из программы.")
\ No newline at end of file
@@ -2,6 +2,31 @@ import re
 from typing import Any, Dict, List, Optional, Tuple
 
 
+class _Placeholder:
+    """
+    Параметр запроса "?", значение подставляется при выполнении через API.
+    """
+
+    def __repr__(self) -> str:
+        return "?"
+
+
+PLACEHOLDER = _Placeholder()
+
+
+class _NoMatch:
+    """
+    Значение условия, которому не равна ни одна запись: так parse_where
+    записывает противоречивые условия на один столбец (a = 1 and a = 3).
+    """
+
+    def __repr__(self) -> str:
+        return "<нет совпадений>"
+
+
+NO_MATCH = _NoMatch()
+
+
 def _strip_quotes(s: str) -> str:
     s = s.strip()
     if (len(s) >= 2) and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
@@ -12,6 +37,8 @@ def _strip_quotes(s: str) -> str:
 def _cast_literal(token: str) -> Any:
     t = token.strip()
     low = t.lower()
+    if t == "?":
+        return PLACEHOLDER
     if (t.startswith('"') and t.endswith('"')) \
         or (t.startswith("'") and t.endswith("'")):
         return _strip_quotes(t)
@@ -79,6 +106,44 @@ def parse_condition(cond: str) -> Dict[str, Any]:
     return {col: val}
 
 
+def _split_and(s: str) -> List[str]:
+    """
+    Разделение условия по ключевому слову AND вне кавычек.
+    """
+    parts: List[str] = []
+    start = 0
+    q: Optional[str] = None
+    for i, ch in enumerate(s):
+        if q:
+            if ch == q:
+                q = None
+        elif ch in ("'", '"'):
+            q = ch
+        elif re.match(r"\sand\s", s[i:i + 5], flags=re.IGNORECASE):
+            parts.append(s[start:i].strip())
+            start = i + 5
+    parts.append(s[start:].strip())
+    return parts
+
+
+def parse_where(s: str) -> Dict[str, Any]:
+    """
+    'a = 1 and b = "x"' -> {'a': 1, 'b': 'x'}
+    """
+    result: Dict[str, Any] = {}
+    for p in _split_and(s):
+        ((col, val),) = parse_condition(p).items()
+        if col in result:
+            if val is PLACEHOLDER or result[col] is PLACEHOLDER:
+                raise ValueError(
+                    f'Повторное условие с параметром "?" для столбца "{col}"'
+                )
+            if result[col] != val:
+                val = NO_MATCH
+        result[col] = val
+    return result
+
+
 def parse_set_clause(s: str) -> Dict[str, Any]:
     """
     'a = 1, b = "x"' -> {'a': 1, 'b': 'x'}
@@ -100,9 +165,24 @@ def parse_insert(cmd: str) -> Tuple[str, List[Any]]:
     return table, values
 
 
-def parse_select(cmd: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+def parse_select(
+    cmd: str,
+) -> Tuple[
+    str,
+    Optional[Dict[str, Any]],
+    Optional[Tuple[str, bool]],
+    Optional[Any],
+    Optional[str],
+]:
+    """
+    'select from t [where ...] [order by c [asc|desc]] [limit n] [into "file"]'
+    -> (t, where, (c, по_убыванию), n, file)
+    """
     m = re.match(
-        r"^\s*select\s+from\s+(\w+)(?:\s+where\s+(.*))?\s*$",
+        r"^\s*select\s+from\s+(\w+)(?:\s+where\s+(.*?))?"
+        r"(?:\s+order\s+by\s+(\w+)(?:\s+(asc|desc))?)?"
+        r"(?:\s+limit\s+(\d+|\?))?"
+        r"(?:\s+into\s+(\"[^\"]+\"|'[^']+'))?\s*$",
         cmd,
         flags=re.IGNORECASE | re.DOTALL,
     )
@@ -110,8 +190,13 @@ def parse_select(cmd: str) -> Tuple[str, Optional[Dict[str, Any]]]:
         raise ValueError("Некорректная команда SELECT")
     table = m.group(1)
     where_raw = m.group(2)
-    where = parse_condition(where_raw) if where_raw else None
-    return table, where
+    where = parse_where(where_raw) if where_raw else None
+    order_by = None
+    if m.group(3):
+        order_by = (m.group(3), (m.group(4) or "asc").lower() == "desc")
+    limit = _cast_literal(m.group(5)) if m.group(5) else None
+    into = _strip_quotes(m.group(6)) if m.group(6) else None
+    return table, where, order_by, limit, into
 
 
 def parse_update(cmd: str) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
@@ -128,7 +213,7 @@ def parse_update(cmd: str) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
     if not where_raw:
         raise ValueError("Для UPDATE требуется выражение WHERE")
     set_clause = parse_set_clause(set_raw)
-    where = parse_condition(where_raw)
+    where = parse_where(where_raw)
     return table, set_clause, where
 
 
@@ -141,7 +226,7 @@ def parse_delete(cmd: str) -> Tuple[str, Dict[str, Any]]:
     if not m:
         raise ValueError("Некорректная команда DELETE")
     table = m.group(1)
-    where = parse_condition(m.group(2))
+    where = parse_where(m.group(2))
     return table, where
 
 
@@ -150,3 +235,28 @@ def parse_info(cmd: str) -> str:
     if not m:
         raise ValueError("Некорректная команда INFO")
     return m.group(1)
+
+
+def parse_analyze(cmd: str) -> str:
+    m = re.match(r"^\s*analyze\s+(\w+)\s*$", cmd, flags=re.IGNORECASE)
+    if not m:
+        raise ValueError("Некорректная команда ANALYZE")
+    return m.group(1)
+
+
+def parse_export(cmd: str) -> Tuple[str, str]:
+    m = re.match(
+        r"^\s*export\s+(\w+)\s+(\"[^\"]+\"|'[^']+'|\S+)\s*$",
+        cmd,
+        flags=re.IGNORECASE,
+    )
+    if not m:
+        raise ValueError("Некорректная команда EXPORT")
+    return m.group(1), _strip_quotes(m.group(2))
+
+
+def parse_vacuum(cmd: str) -> str:
+    m = re.match(r"^\s*vacuum\s+(\w+)\s*$", cmd, flags=re.IGNORECASE)
+    if not m:
+        raise ValueError("Некорректная команда VACUUM")
+    return m.group(1)
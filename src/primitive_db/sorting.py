@@ -0,0 +1,67 @@
+import heapq
+import json
+import tempfile
+from contextlib import ExitStack
+from itertools import chain, islice
+from operator import itemgetter
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+# Сколько записей сортируется в памяти; больший результат делится
+# на отсортированные серии во временных файлах и сливается.
+SORT_MEMORY_ROWS = 100_000
+
+
+def _spill(run: List[Dict[str, Any]], stack: ExitStack) -> IO[str]:
+    f = stack.enter_context(tempfile.TemporaryFile("w+", encoding="utf-8"))
+    f.writelines(json.dumps(rec, ensure_ascii=False) + "\n" for rec in run)
+    f.seek(0)
+    return f
+
+
+def _read_run(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        yield json.loads(line)
+
+
+def sort_rows(
+    rows: Iterable[Dict[str, Any]],
+    column: str,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    memory_rows: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Упорядочить записи по column (устойчиво).
+
+    С limit выбираются первые limit записей через кучу (heapq), без сортировки
+    всего результата. Без limit записи сортируются сериями по memory_rows
+    (по умолчанию — текущее значение SORT_MEMORY_ROWS); если серий больше
+    одной, они сбрасываются во временные файлы и сливаются heapq.merge.
+    """
+    key = itemgetter(column)
+    if limit is not None:
+        select_top = heapq.nlargest if descending else heapq.nsmallest
+        yield from select_top(limit, rows, key=key)
+        return
+
+    if memory_rows is None:
+        memory_rows = SORT_MEMORY_ROWS
+    it = iter(rows)
+    run = sorted(islice(it, memory_rows), key=key, reverse=descending)
+    first_extra = next(it, None)
+    if first_extra is None:
+        yield from run
+        return
+
+    it = chain([first_extra], it)
+    with ExitStack() as stack:
+        runs = [_spill(run, stack)]
+        del run
+        while True:
+            chunk = sorted(islice(it, memory_rows), key=key, reverse=descending)
+            if not chunk:
+                break
+            runs.append(_spill(chunk, stack))
+        yield from heapq.merge(
+            *(_read_run(f) for f in runs), key=key, reverse=descending
+        )
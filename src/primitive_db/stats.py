@@ -0,0 +1,239 @@
+import math
+import zlib
+from bisect import insort
+from typing import Any, Dict, List, Optional, Tuple
+
+HISTOGRAM_BUCKETS = 8
+SKETCH_SIZE = 32
+_HASH_SPACE = 2 ** 32
+
+# Стоимость проверки одной записи при полном просмотре и одного шага
+# бинарного поиска по ID — в условных единицах.
+ROW_SCAN_COST = 1.0
+ID_LOOKUP_STEP_COST = 1.0
+
+
+def _hash_value(value: Any) -> int:
+    """
+    Стабильный между запусками хэш значения (crc32 от repr).
+    """
+    return zlib.crc32(repr(value).encode("utf-8"))
+
+
+def _sketch_add(sketch: List[int], value: Any) -> None:
+    """
+    Добавить значение в KMV-скетч (k минимальных хэшей) для оценки числа
+    различных значений.
+    """
+    h = _hash_value(value)
+    if h in sketch:
+        return
+    if len(sketch) < SKETCH_SIZE:
+        insort(sketch, h)
+    elif h < sketch[-1]:
+        insort(sketch, h)
+        sketch.pop()
+
+
+def _sketch_estimate(sketch: List[int]) -> int:
+    if len(sketch) < SKETCH_SIZE:
+        return len(sketch)
+    return int((SKETCH_SIZE - 1) * _HASH_SPACE / (sketch[-1] + 1))
+
+
+def _bucket_index(col: Dict[str, Any], value: int) -> int:
+    lo, width = col["hist_min"], col["hist_width"]
+    idx = (value - lo) // width
+    return max(0, min(len(col["histogram"]) - 1, idx))
+
+
+def _build_column(type_name: str, values: List[Any]) -> Dict[str, Any]:
+    col: Dict[str, Any] = {"min": None, "max": None, "sketch": []}
+    if values:
+        col["min"] = min(values)
+        col["max"] = max(values)
+    for v in values:
+        _sketch_add(col["sketch"], v)
+
+    if type_name == "bool":
+        col["histogram"] = [
+            sum(1 for v in values if not v),
+            sum(1 for v in values if v),
+        ]
+    elif type_name == "int" and values:
+        lo, hi = col["min"], col["max"]
+        width = max(1, math.ceil((hi - lo + 1) / HISTOGRAM_BUCKETS))
+        col["hist_min"] = lo
+        col["hist_width"] = width
+        col["histogram"] = [0] * HISTOGRAM_BUCKETS
+        for v in values:
+            col["histogram"][_bucket_index(col, v)] += 1
+    return col
+
+
+def build_stats(
+    schema: List[Tuple[str, str]],
+    table_data: List[Dict[str, Any]],
+    stored_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Полный пересчёт статистики таблицы (команда analyze) по живым записям
+    table_data. stored_rows — сколько записей физически лежит в файле
+    таблицы вместе с удалёнными (по умолчанию len(table_data)).
+    """
+    columns: Dict[str, Any] = {}
+    for name, typ in schema:
+        values = [rec[name] for rec in table_data if rec.get(name) is not None]
+        columns[name] = _build_column(typ, values)
+    if stored_rows is None:
+        stored_rows = len(table_data)
+    return {
+        "row_count": len(table_data),
+        "stored_rows": stored_rows,
+        "columns": columns,
+    }
+
+
+def _column_add(col: Dict[str, Any], value: Any) -> None:
+    if value is None:
+        return
+    if col["min"] is None or value < col["min"]:
+        col["min"] = value
+    if col["max"] is None or value > col["max"]:
+        col["max"] = value
+    _sketch_add(col["sketch"], value)
+    hist = col.get("histogram")
+    if hist is None:
+        return
+    if isinstance(value, bool):
+        hist[int(value)] += 1
+    elif "hist_min" in col:
+        hist[_bucket_index(col, value)] += 1
+
+
+def _column_remove(col: Dict[str, Any], value: Any) -> None:
+    # min/max и скетч не сужаются — остаются консервативными до analyze.
+    hist = col.get("histogram")
+    if hist is None or value is None:
+        return
+    if isinstance(value, bool):
+        idx = int(value)
+    elif "hist_min" in col:
+        idx = _bucket_index(col, value)
+    else:
+        return
+    hist[idx] = max(0, hist[idx] - 1)
+
+
+def stats_on_insert(stats: Optional[Dict[str, Any]], record: Dict[str, Any]) -> None:
+    if stats is None:
+        return
+    stats["row_count"] += 1
+    if "stored_rows" in stats:
+        stats["stored_rows"] += 1
+    for name, col in stats["columns"].items():
+        _column_add(col, record.get(name))
+
+
+def stats_on_update(
+    stats: Optional[Dict[str, Any]],
+    old_values: Dict[str, Any],
+    new_values: Dict[str, Any],
+) -> None:
+    if stats is None:
+        return
+    for name, new in new_values.items():
+        col = stats["columns"].get(name)
+        if col is None:
+            continue
+        _column_remove(col, old_values.get(name))
+        _column_add(col, new)
+
+
+def stats_on_delete(stats: Optional[Dict[str, Any]], record: Dict[str, Any]) -> None:
+    if stats is None:
+        return
+    stats["row_count"] = max(0, stats["row_count"] - 1)
+    for name, col in stats["columns"].items():
+        _column_remove(col, record.get(name))
+
+
+def distinct_count(stats: Dict[str, Any], column: str) -> int:
+    col = stats["columns"][column]
+    return max(1, min(stats["row_count"], _sketch_estimate(col["sketch"])))
+
+
+def estimate_selectivity(stats: Dict[str, Any], column: str, value: Any) -> float:
+    """
+    Оценка доли записей, удовлетворяющих условию column = value (0..1).
+    """
+    rows = stats["row_count"]
+    col = stats["columns"].get(column)
+    if rows == 0:
+        return 0.0
+    if col is None:
+        return 1.0
+    if column == "ID":
+        # ID — всегда int; строка, bool или "?" не совпадут ни с одной записью,
+        # а бинарный поиск по ним упал бы на сравнении разных типов.
+        if isinstance(value, bool) or not isinstance(value, int):
+            return 0.0
+        return 1.0 / rows
+    if col["min"] is None:
+        return 0.0
+    try:
+        if value < col["min"] or value > col["max"]:
+            return 0.0
+    except TypeError:
+        # Значение другого типа никогда не совпадёт со значением столбца.
+        return 0.0
+
+    hist = col.get("histogram")
+    if isinstance(value, bool) and hist is not None:
+        return hist[int(value)] / rows
+    distinct = distinct_count(stats, column)
+    if hist is not None and "hist_min" in col:
+        bucket_frac = hist[_bucket_index(col, value)] / rows
+        per_bucket = max(1.0, distinct / len(hist))
+        return bucket_frac / per_bucket
+    return 1.0 / distinct
+
+
+def plan_where(
+    stats: Optional[Dict[str, Any]],
+    where_clause: Dict[str, Any],
+    stored_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Выбрать путь доступа для where_clause и порядок проверки условий.
+
+    Возвращает словарь:
+    - path: "full_scan", "id_lookup" (бинарный поиск по ID — записи хранятся
+      упорядоченными по ID) или "empty" (по статистике совпадений нет);
+    - predicates: список (столбец, значение) — сначала самые селективные;
+    - cost: оценка стоимости выбранного пути.
+
+    "empty" выбирается, только если статистика соответствует данным:
+    stored_rows (число записей в таблице вместе с удалёнными) совпадает
+    с тем, что записано в статистике. Иначе (файл данных изменён в обход
+    СУБД, поток неизвестной длины) статистика влияет лишь на порядок условий.
+    """
+    predicates = list(where_clause.items())
+    if stats is None:
+        return {"path": "full_scan", "predicates": predicates, "cost": math.inf}
+
+    rows = stats["row_count"]
+    selectivity = {k: estimate_selectivity(stats, k, v) for k, v in predicates}
+    predicates.sort(key=lambda kv: selectivity[kv[0]])
+
+    trusted = stored_rows is not None and stats.get("stored_rows") == stored_rows
+    if trusted and any(sel == 0.0 for sel in selectivity.values()):
+        return {"path": "empty", "predicates": predicates, "cost": 0.0}
+
+    candidates = {"full_scan": rows * ROW_SCAN_COST}
+    if "ID" in where_clause:
+        candidates["id_lookup"] = (
+            math.log2(rows + 1) * ID_LOOKUP_STEP_COST + ROW_SCAN_COST
+        )
+    path = min(candidates, key=candidates.get)
+    return {"path": path, "predicates": predicates, "cost": candidates[path]}
@@ -1,56 +1,300 @@
+import csv
 import json
 import os
-from typing import Any, Dict, List
+from collections.abc import MutableMapping
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 
 DATA_DIR = "data"
+READ_CHUNK_SIZE = 64 * 1024
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_FORMATS = (".csv", ".jsonl")
 
 
-def _ensure_data_dir() -> None:
-    if not os.path.isdir(DATA_DIR):
-        os.makedirs(DATA_DIR, exist_ok=True)
+def _ensure_data_dir(data_dir: str = DATA_DIR) -> None:
+    if not os.path.isdir(data_dir):
+        os.makedirs(data_dir, exist_ok=True)
 
 
-def _table_path(table_name: str) -> str:
-    return os.path.join(DATA_DIR, f"{table_name}.json")
+def _table_path(table_name: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"{table_name}.json")
+
+
+class TableCatalog(MutableMapping):
+    """
+    Метаданные таблиц: по одному JSON-файлу на таблицу в каталоге catalog_dir.
+
+    Запись таблицы читается с диска при первом обращении, список имён
+    строится один раз при первой необходимости (list_tables) и отдаётся
+    по алфавиту. Изменения копятся в памяти и записываются flush() — только
+    таблицы, заданные через присваивание или отмеченные mark_dirty().
+    """
+
+    def __init__(self, catalog_dir: str) -> None:
+        self.catalog_dir = catalog_dir
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._names: Optional[Set[str]] = None
+        self._touched: Set[str] = set()
+        self._dropped: Set[str] = set()
+
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.catalog_dir, f"{table_name}.json")
+
+    def _load_names(self) -> Set[str]:
+        if self._names is None:
+            names: Set[str] = set()
+            if os.path.isdir(self.catalog_dir):
+                names = {
+                    fname[:-len(".json")]
+                    for fname in os.listdir(self.catalog_dir)
+                    if fname.endswith(".json")
+                }
+            self._names = (names | self._entries.keys()) - self._dropped
+        return self._names
+
+    def __getitem__(self, table_name: str) -> Dict[str, Any]:
+        entry = self._entries.get(table_name)
+        if entry is None:
+            if table_name in self._dropped:
+                raise KeyError(table_name)
+            try:
+                with open(self._path(table_name), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                raise KeyError(table_name) from None
+            self._entries[table_name] = entry
+        return entry
+
+    def mark_dirty(self, table_name: str) -> None:
+        """
+        Отметить, что запись таблицы изменена по ссылке.
+        """
+        if table_name not in self._entries:
+            raise KeyError(table_name)
+        self._touched.add(table_name)
+
+    def __contains__(self, table_name: object) -> bool:
+        if table_name in self._entries:
+            return True
+        if self._names is not None:
+            return table_name in self._names
+        return table_name not in self._dropped and os.path.isfile(
+            self._path(str(table_name))
+        )
+
+    def __setitem__(self, table_name: str, entry: Dict[str, Any]) -> None:
+        self._entries[table_name] = entry
+        self._touched.add(table_name)
+        self._dropped.discard(table_name)
+        if self._names is not None:
+            self._names.add(table_name)
+
+    def __delitem__(self, table_name: str) -> None:
+        if table_name not in self:
+            raise KeyError(table_name)
+        self._entries.pop(table_name, None)
+        self._touched.discard(table_name)
+        self._dropped.add(table_name)
+        if self._names is not None:
+            self._names.discard(table_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._load_names()))
+
+    def __len__(self) -> int:
+        return len(self._load_names())
+
+    def flush(self) -> None:
+        """
+        Записать на диск изменённые и удалённые таблицы.
+        """
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        for table_name in self._dropped:
+            try:
+                os.remove(self._path(table_name))
+            except FileNotFoundError:
+                pass
+        for table_name in self._touched:
+            with open(self._path(table_name), "w", encoding="utf-8") as f:
+                json.dump(self._entries[table_name], f, ensure_ascii=False, indent=4)
+        self._dropped.clear()
+        self._touched.clear()
+
+
+def _catalog_dir(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + ".d"
 
 
 def load_metadata(filepath: str) -> Dict[str, Any]:
     """
-    Загрузить словарь метаданных из JSON-файла. Если файл не найден, вернуть {}.
+    Открыть метаданные: {"tables": TableCatalog}. Сами таблицы не читаются.
+    Файл в старом формате (все таблицы в одном JSON) раскладывается по
+    отдельным файлам при первом save_metadata.
     """
     try:
         with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+            header = json.load(file)
     except FileNotFoundError:
-        return {}
+        header = {}
+    catalog_dir = _catalog_dir(filepath)
+    if "catalog" in header:
+        catalog_dir = os.path.join(os.path.dirname(filepath), header["catalog"])
+    catalog = TableCatalog(catalog_dir)
+    for table_name, entry in header.get("tables", {}).items():
+        catalog[table_name] = entry
+    return {"tables": catalog}
 
 
 def save_metadata(filepath: str, data: Dict[str, Any]) -> None:
     """
-    Сохранить словарь метаданных в JSON-файл с отступами.
+    Сохранить изменённые метаданные таблиц. filepath хранит только
+    ссылку на каталог с файлами таблиц.
     """
+    data["tables"].flush()
+    catalog_dir = os.path.basename(data["tables"].catalog_dir)
+    header = {"catalog": catalog_dir}
+    try:
+        with open(filepath, "r", encoding="utf-8") as file:
+            if json.load(file) == header:
+                return
+    except (FileNotFoundError, ValueError):
+        pass
     with open(filepath, "w", encoding="utf-8") as fpath:
-        json.dump(data, fpath, ensure_ascii=False, indent=4)
+        json.dump(header, fpath, ensure_ascii=False, indent=4)
 
 
-def load_table_data(table_name: str) -> List[Dict[str, Any]]:
+def load_table_data(
+    table_name: str,
+    data_dir: str = DATA_DIR,
+) -> List[Dict[str, Any]]:
     """
     Загрузить данные таблицы из data/<table_name>.json.
     Если файла нет, вернуть пустой список.
     """
-    _ensure_data_dir()
-    path = _table_path(table_name)
+    _ensure_data_dir(data_dir)
+    path = _table_path(table_name, data_dir)
     if not os.path.isfile(path):
         return []
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def save_table_data(table_name: str, data: List[Dict[str, Any]]) -> None:
+def save_table_data(
+    table_name: str,
+    data: List[Dict[str, Any]],
+    data_dir: str = DATA_DIR,
+) -> None:
     """
     Сохранить данные таблицы в data/<table_name>.json.
     """
-    _ensure_data_dir()
-    path = _table_path(table_name)
+    _ensure_data_dir(data_dir)
+    path = _table_path(table_name, data_dir)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def delete_table_data(table_name: str, data_dir: str = DATA_DIR) -> None:
+    """
+    Удалить файл данных таблицы data/<table_name>.json, если он есть.
+    """
+    try:
+        os.remove(_table_path(table_name, data_dir))
+    except FileNotFoundError:
+        pass
+
+
+def iter_table_data(
+    table_name: str,
+    chunk_size: int = READ_CHUNK_SIZE,
+    data_dir: str = DATA_DIR,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково читать записи из data/<table_name>.json по одной, читая файл
+    блоками по chunk_size символов. В памяти держится только текущий блок.
+    """
+    _ensure_data_dir(data_dir)
+    path = _table_path(table_name, data_dir)
+    if not os.path.isfile(path):
+        return
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    return
+                buf = f.read(chunk_size)
+                pos = 0
+                eof = not buf
+                continue
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"Некорректный файл данных: {path}")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Некорректный файл данных: {path}")
+                more = f.read(chunk_size)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield record
+            pos = end
+
+
+def _csv_value(value: Any) -> Any:
+    # Логические значения пишем так же, как их принимает парсер команд.
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def export_rows(
+    filepath: str,
+    rows: Iterable[Dict[str, Any]],
+    headers: List[str],
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> int:
+    """
+    Записать rows в CSV или JSONL (по расширению filepath) порциями
+    по chunk_rows записей. Возвращает количество записанных строк.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Неподдерживаемый формат файла: {filepath}. Ожидалось .csv или .jsonl"
+        )
+    count = 0
+    it = iter(rows)
+    with open(filepath, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f) if ext == ".csv" else None
+        if writer is not None:
+            writer.writerow(headers)
+        while True:
+            chunk = list(islice(it, chunk_rows))
+            if not chunk:
+                break
+            if writer is not None:
+                writer.writerows(
+                    [_csv_value(rec.get(h)) for h in headers] for rec in chunk
+                )
+            else:
+                f.writelines(
+                    json.dumps({h: rec.get(h) for h in headers}, ensure_ascii=False)
+                    + "\n"
+                    for rec in chunk
+                )
+            count += len(chunk)
+    return count
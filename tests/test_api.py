@@ -0,0 +1,112 @@
+import pytest
+
+from src.primitive_db import connect
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "db")
+    with connect(path) as conn:
+        conn.execute("create_table users name:str age:int active:bool")
+        conn.executemany(
+            "insert into users values (?, ?, ?)",
+            [("Alex", 22, True), ("Ivan", 38, False), ("Olga", 22, True)],
+        )
+    return path
+
+
+def _names(conn, sql="select from users", params=()):
+    return [row[1] for row in conn.execute(sql, params)]
+
+
+def test_placeholders_bind_python_values(db):
+    conn = connect(db)
+
+    cur = conn.execute("select from users where age = ? and active = ?", (22, True))
+    assert [d[0] for d in cur.description] == ["ID", "name", "age", "active"]
+    assert cur.fetchall() == [(1, "Alex", 22, True), (3, "Olga", 22, True)]
+
+    # Значение параметра не разбирается как литерал.
+    conn.execute("insert into users values (?, ?, ?)", ('x", 1, true', 5, False))
+    assert _names(conn, "select from users where age = ?", (5,)) == ['x", 1, true']
+    assert _names(conn, "select from users order by age desc limit ?", (1,)) == [
+        "Ivan"
+    ]
+
+
+def test_parameter_count_errors(db):
+    conn = connect(db)
+
+    with pytest.raises(ValueError):
+        conn.execute("select from users where age = ?")
+    with pytest.raises(ValueError):
+        conn.execute("select from users where age = ?", (22, 23))
+    with pytest.raises(ValueError):
+        conn.execute("insert into users values (?, ?, ?)", ("Petr", 30))
+    with pytest.raises(ValueError):
+        conn.execute("update users set age = ? where name = ?", (1, "Alex", 2))
+    assert len(_names(conn)) == 3
+
+
+def test_fetch_methods(db):
+    cur = connect(db).execute("select from users")
+
+    assert cur.fetchone()[1] == "Alex"
+    assert [r[1] for r in cur.fetchmany(5)] == ["Ivan", "Olga"]
+    assert cur.fetchone() is None
+    assert cur.fetchall() == []
+
+
+def test_executemany_counts_rows(db):
+    conn = connect(db)
+
+    cur = conn.executemany(
+        "update users set active = ? where age = ?", [(False, 22), (True, 99)]
+    )
+    assert cur.rowcount == 2
+    cur = conn.executemany("delete from users where name = ?", [("Alex",), ("Ivan",)])
+    assert cur.rowcount == 2
+    assert _names(conn) == ["Olga"]
+
+
+def test_commit_and_rollback(db):
+    conn = connect(db)
+    cur = conn.execute("insert into users values (?, ?, ?)", ("Petr", 30, True))
+    assert cur.lastrowid == 4
+    conn.rollback()
+    assert _names(connect(db)) == ["Alex", "Ivan", "Olga"]
+    assert _names(conn) == ["Alex", "Ivan", "Olga"]
+
+    conn.execute("update users set age = ? where name = ?", (23, "Alex"))
+    assert _names(connect(db), "select from users where age = 23") == []
+    conn.commit()
+    assert _names(connect(db), "select from users where age = 23") == ["Alex"]
+
+
+def test_with_block_rolls_back_on_error(db):
+    with pytest.raises(ValueError):
+        with connect(db) as conn:
+            conn.execute("delete from users where name = ?", ("Alex",))
+            conn.execute("select from missing")
+
+    assert _names(connect(db)) == ["Alex", "Ivan", "Olga"]
+
+
+def test_drop_and_recreate_table_starts_empty(db):
+    conn = connect(db)
+    conn.execute("drop_table users")
+    conn.execute("create_table users name:str age:int active:bool")
+    conn.commit()
+
+    assert _names(connect(db)) == []
+
+    conn.execute("drop_table users")
+    conn.commit()
+    reopened = connect(db)
+    reopened.execute("create_table users name:str")
+    assert _names(reopened) == []
+
+
+def test_unsupported_command(db):
+    with pytest.raises(ValueError):
+        connect(db).execute("info users")
@@ -0,0 +1,80 @@
+import random
+import tempfile
+
+import pytest
+
+from src.primitive_db import core, sorting
+from src.primitive_db.sorting import sort_rows
+
+
+@pytest.fixture
+def spills(monkeypatch):
+    opened = []
+    temporary_file = tempfile.TemporaryFile
+
+    def counting(*args, **kwargs):
+        f = temporary_file(*args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr(sorting.tempfile, "TemporaryFile", counting)
+    return opened
+
+
+def _rows(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {"ID": i, "n": rnd.randrange(7), "s": f"v{rnd.randrange(100)}"}
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("column", ["n", "s"])
+def test_sort_rows_spills_and_is_stable(spills, column, descending):
+    rows = _rows(250)
+
+    out = list(sort_rows(iter(rows), column, descending, memory_rows=16))
+
+    # sorted() устойчив, поэтому при равных значениях порядок ID сохраняется.
+    assert out == sorted(rows, key=lambda r: r[column], reverse=descending)
+    assert len(spills) == 16
+    assert all(f.closed for f in spills)
+
+
+def test_sort_rows_exact_budget_does_not_spill(spills):
+    rows = _rows(16)
+
+    out = list(sort_rows(iter(rows), "n", memory_rows=16))
+
+    assert out == sorted(rows, key=lambda r: r["n"])
+    assert spills == []
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_rows_limit_uses_top_n(spills, descending):
+    rows = _rows(100)
+
+    out = list(sort_rows(iter(rows), "n", descending, limit=5, memory_rows=4))
+
+    assert out == sorted(rows, key=lambda r: r["n"], reverse=descending)[:5]
+    assert spills == []
+
+
+def test_iter_select_uses_module_memory_budget(spills, monkeypatch):
+    monkeypatch.setattr(sorting, "SORT_MEMORY_ROWS", 10)
+    rows = _rows(95)
+
+    out = list(core.iter_select(rows, None, None, ("n", False)))
+
+    assert out == sorted(rows, key=lambda r: r["n"])
+    assert len(spills) == 10
+
+
+def test_iter_select_order_by_id_skips_tombstones():
+    rows = _rows(6)
+    rows[2] = {"ID": 3, core.TOMBSTONE: True}
+
+    out = list(core.iter_select(rows, None, None, ("ID", True), 3))
+
+    assert [r["ID"] for r in out] == [6, 5, 4]
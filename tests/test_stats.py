@@ -0,0 +1,190 @@
+from inspect import unwrap
+
+import pytest
+
+from src.primitive_db import core
+from src.primitive_db.parser import parse_where
+from src.primitive_db.stats import (
+    HISTOGRAM_BUCKETS,
+    build_stats,
+    estimate_selectivity,
+    plan_where,
+    stats_on_delete,
+    stats_on_insert,
+    stats_on_update,
+)
+
+SCHEMA = [("ID", "int"), ("a", "int"), ("ok", "bool"), ("s", "str")]
+
+create_table = unwrap(core.create_table)
+insert = unwrap(core.insert)
+select = unwrap(core.select)
+update = unwrap(core.update)
+
+
+def _rows(n):
+    return [
+        {"ID": i, "a": i % 10, "ok": i % 4 == 0, "s": f"v{i % 3}"}
+        for i in range(1, n + 1)
+    ]
+
+
+def _table(n):
+    metadata = {"tables": {}}
+    create_table(metadata, "t", ["a:int", "ok:bool", "s:str"])
+    data = []
+    for rec in _rows(n):
+        insert(metadata, "t", [rec["a"], rec["ok"], rec["s"]], data)
+    return metadata, data
+
+
+def _stats(metadata):
+    return metadata["tables"]["t"]["stats"]
+
+
+def test_selectivity_bounds_and_histograms():
+    stats = build_stats(SCHEMA, _rows(100))
+
+    assert estimate_selectivity(stats, "ID", 7) == pytest.approx(0.01)
+    assert estimate_selectivity(stats, "a", 10) == 0.0
+    assert estimate_selectivity(stats, "a", -1) == 0.0
+    assert estimate_selectivity(stats, "ok", True) == pytest.approx(0.25)
+    assert estimate_selectivity(stats, "ok", False) == pytest.approx(0.75)
+    assert estimate_selectivity(stats, "s", "v1") == pytest.approx(1 / 3)
+    assert estimate_selectivity(stats, "missing", 1) == 1.0
+    assert 0.0 < estimate_selectivity(stats, "a", 3) <= 1.0
+
+
+@pytest.mark.parametrize("value", ["1", True, False, None])
+def test_selectivity_of_non_int_id_is_zero(value):
+    stats = build_stats(SCHEMA, _rows(10))
+
+    assert estimate_selectivity(stats, "ID", value) == 0.0
+
+
+def test_selectivity_of_mismatched_type_is_zero():
+    stats = build_stats(SCHEMA, _rows(10))
+
+    assert estimate_selectivity(stats, "a", "3") == 0.0
+    assert estimate_selectivity(build_stats(SCHEMA, []), "a", 3) == 0.0
+
+
+def test_incremental_stats_match_rebuild():
+    rows = _rows(40)
+    stats = build_stats(SCHEMA, rows[:20])
+    for rec in rows[20:]:
+        stats_on_insert(stats, rec)
+
+    assert stats["row_count"] == stats["stored_rows"] == 40
+    assert stats["columns"]["a"]["min"] == 0
+    assert stats["columns"]["a"]["max"] == 9
+    assert stats["columns"]["ok"]["histogram"] == [30, 10]
+    assert sum(stats["columns"]["a"]["histogram"]) == 40
+
+    stats_on_insert(stats, {"ID": 41, "a": 100, "ok": True, "s": "v9"})
+    assert stats["columns"]["a"]["max"] == 100
+    assert len(stats["columns"]["a"]["histogram"]) == HISTOGRAM_BUCKETS
+    # Значение за правой границей гистограммы попадает в последний интервал.
+    assert stats["columns"]["a"]["histogram"][-1] >= 1
+
+
+def test_incremental_update_and_delete_move_counts():
+    stats = build_stats(SCHEMA, _rows(8))
+    rec = {"ID": 4, "a": 4, "ok": True, "s": "v1"}
+
+    stats_on_update(stats, rec, {"ok": False})
+    assert stats["columns"]["ok"]["histogram"] == [7, 1]
+
+    rec["ok"] = False
+    stats_on_delete(stats, rec)
+    assert stats["row_count"] == 7
+    assert stats["columns"]["ok"]["histogram"] == [6, 1]
+    assert sum(stats["columns"]["a"]["histogram"]) == 7
+    # min/max не сужаются до analyze.
+    assert stats["columns"]["a"]["max"] == 8
+
+
+def test_plan_where_paths():
+    rows = _rows(1000)
+    stats = build_stats(SCHEMA, rows)
+
+    assert plan_where(None, {"a": 1})["path"] == "full_scan"
+    assert plan_where(stats, {"a": 1}, 1000)["path"] == "full_scan"
+    assert plan_where(stats, {"ID": 5, "a": 1}, 1000)["path"] == "id_lookup"
+    assert plan_where(stats, {"a": 50}, 1000)["path"] == "empty"
+    assert plan_where(stats, {"ID": "5"}, 1000)["path"] == "empty"
+
+
+def test_plan_where_orders_predicates_by_selectivity():
+    stats = build_stats(SCHEMA, _rows(1000))
+
+    plan = plan_where(stats, {"ok": False, "s": "v1", "a": 3}, 1000)
+
+    assert [k for k, _ in plan["predicates"]] == ["a", "s", "ok"]
+
+
+@pytest.mark.parametrize("stored_rows", [None, 999, 1001])
+def test_plan_where_untrusted_stats_never_empty(stored_rows):
+    stats = build_stats(SCHEMA, _rows(1000))
+
+    assert plan_where(stats, {"a": 50}, stored_rows)["path"] == "full_scan"
+
+
+def test_select_with_stale_stats_scans_data():
+    metadata, data = _table(5)
+    # Статистика пустой таблицы, а в файле данных остались записи.
+    metadata["tables"]["t"]["stats"] = build_stats(SCHEMA, [])
+
+    assert [r["ID"] for r in select(data, {"a": 3}, _stats(metadata))] == [3]
+    assert [r["ID"] for r in select(data, {"ID": 2}, _stats(metadata))] == [2]
+
+
+@pytest.mark.parametrize("value", ["1", True])
+def test_select_by_id_with_non_int_value(value):
+    metadata, data = _table(5)
+
+    assert select(data, {"ID": value}, _stats(metadata)) == []
+    assert list(core.iter_select(data, {"ID": value}, _stats(metadata))) == []
+    assert list(core.iter_select(iter(data), {"ID": value}, None)) == []
+
+
+def test_select_by_id_uses_stored_order():
+    metadata, data = _table(200)
+
+    assert select(data, {"ID": 150, "a": 0}, _stats(metadata)) == [data[149]]
+    assert select(data, {"ID": 150, "a": 1}, _stats(metadata)) == []
+    assert select(data, {"ID": 500}, _stats(metadata)) == []
+
+
+def test_conflicting_duplicate_condition_matches_nothing():
+    metadata, data = _table(5)
+    where = parse_where("a = 1 and a = 3")
+
+    assert select(data, where, _stats(metadata)) == []
+    assert select(data, parse_where("a = 1 and a = 1"), _stats(metadata)) == [data[0]]
+    with pytest.raises(ValueError):
+        parse_where("a = ? and a = 1")
+
+
+def test_failed_update_leaves_rows_unchanged():
+    metadata, data = _table(5)
+    before = [dict(rec) for rec in data]
+    stats_before = repr(_stats(metadata))
+
+    with pytest.raises(ValueError):
+        update(metadata, "t", data, {"a": 7, "ok": "yes"}, {"s": "v1"})
+    with pytest.raises(ValueError):
+        update(metadata, "t", data, {"a": 7, "ID": 9}, {"s": "v1"})
+
+    assert data == before
+    assert repr(_stats(metadata)) == stats_before
+
+
+def test_update_keeps_stats_in_sync():
+    metadata, data = _table(8)
+
+    _, ids = update(metadata, "t", data, {"ok": True}, {"ok": False})
+
+    assert ids == [1, 2, 3, 5, 6, 7]
+    assert _stats(metadata)["columns"]["ok"]["histogram"] == [0, 8]
+    assert select(data, {"ok": False}, _stats(metadata)) == []
@@ -0,0 +1,135 @@
+import json
+from inspect import unwrap
+
+import pytest
+
+from src.primitive_db import core
+from src.primitive_db.utils import (
+    TableCatalog,
+    iter_table_data,
+    load_metadata,
+    save_metadata,
+)
+
+RECORDS = [
+    {"ID": 1, "name": "a]b", "note": "x, y", "ok": True},
+    {"ID": 2, "name": "{\"q\": [1, 2]}", "note": "", "ok": False},
+    {"ID": 3, "name": "кириллица ],[", "note": "\\\\]", "ok": True},
+]
+
+
+def _write_table(data_dir, table_name, data, indent=4):
+    data_dir.mkdir(exist_ok=True)
+    path = data_dir / f"{table_name}.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), "utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_iter_table_data_matches_json_load(tmp_path, chunk_size, indent):
+    data_dir = tmp_path / "data"
+    path = _write_table(data_dir, "t", RECORDS, indent)
+
+    rows = list(iter_table_data("t", chunk_size=chunk_size, data_dir=str(data_dir)))
+
+    with open(path, encoding="utf-8") as f:
+        assert rows == json.load(f)
+
+
+def test_iter_table_data_empty_and_missing(tmp_path):
+    data_dir = tmp_path / "data"
+    _write_table(data_dir, "empty", [])
+
+    assert list(iter_table_data("empty", chunk_size=1, data_dir=str(data_dir))) == []
+    assert list(iter_table_data("missing", data_dir=str(data_dir))) == []
+
+
+def test_iter_table_data_truncated_file(tmp_path):
+    data_dir = tmp_path / "data"
+    path = _write_table(data_dir, "t", RECORDS)
+    path.write_text(path.read_text("utf-8")[:-10], "utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_table_data("t", chunk_size=5, data_dir=str(data_dir)))
+
+
+def _entry(*columns):
+    return {"structure": [{"name": n, "type": "int"} for n in ("ID",) + columns]}
+
+
+def test_catalog_drop_recreate_flush(tmp_path):
+    catalog_dir = tmp_path / "db_meta.d"
+    catalog = TableCatalog(str(catalog_dir))
+    catalog["a"] = _entry("x")
+    catalog["b"] = _entry("y")
+    catalog.flush()
+
+    del catalog["a"]
+    assert "a" not in catalog
+    with pytest.raises(KeyError):
+        catalog["a"]
+    catalog["a"] = _entry("z")
+    del catalog["b"]
+    catalog.flush()
+
+    reloaded = TableCatalog(str(catalog_dir))
+    assert list(reloaded) == ["a"]
+    assert "b" not in reloaded
+    assert reloaded["a"] == _entry("z")
+    assert sorted(p.name for p in catalog_dir.iterdir()) == ["a.json"]
+
+
+def test_catalog_reads_do_not_rewrite_entries(tmp_path):
+    catalog_dir = tmp_path / "db_meta.d"
+    catalog = TableCatalog(str(catalog_dir))
+    for name in ("a", "b", "c"):
+        catalog[name] = _entry("x")
+    catalog.flush()
+
+    reloaded = TableCatalog(str(catalog_dir))
+    for name in reloaded:
+        reloaded[name]
+    # Файл, изменённый в обход каталога, не перезаписывается после чтения.
+    (catalog_dir / "a.json").write_text(json.dumps(_entry("other")), "utf-8")
+    reloaded["d"] = _entry("w")
+    reloaded.flush()
+
+    assert TableCatalog(str(catalog_dir))["a"] == _entry("other")
+
+
+def test_catalog_flushes_only_marked_tables(tmp_path):
+    meta_path = str(tmp_path / "db_meta.json")
+    metadata = load_metadata(meta_path)
+    create_table = unwrap(core.create_table)
+    create_table(metadata, "a", ["x:int"])
+    create_table(metadata, "b", ["y:int"])
+    save_metadata(meta_path, metadata)
+
+    metadata = load_metadata(meta_path)
+    data = []
+    unwrap(core.insert)(metadata, "a", [5], data)
+    metadata["tables"]["b"]
+    assert metadata["tables"]._touched == {"a"}
+    save_metadata(meta_path, metadata)
+
+    assert load_metadata(meta_path)["tables"]["a"]["stats"]["row_count"] == 1
+
+
+def test_load_metadata_migrates_legacy_file(tmp_path):
+    meta_path = tmp_path / "db_meta.json"
+    legacy = {"tables": {"users": _entry("age"), "items": _entry("price")}}
+    meta_path.write_text(json.dumps(legacy), "utf-8")
+
+    metadata = load_metadata(str(meta_path))
+    assert sorted(metadata["tables"]) == ["items", "users"]
+    save_metadata(str(meta_path), metadata)
+
+    assert json.loads(meta_path.read_text("utf-8")) == {"catalog": "db_meta.d"}
+    assert sorted(p.name for p in (tmp_path / "db_meta.d").iterdir()) == [
+        "items.json",
+        "users.json",
+    ]
+    reloaded = load_metadata(str(meta_path))["tables"]
+    assert reloaded["users"] == legacy["tables"]["users"]
+    assert reloaded["items"] == legacy["tables"]["items"]
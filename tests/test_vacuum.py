@@ -0,0 +1,121 @@
+import json
+import os
+from inspect import unwrap
+
+import pytest
+
+from src.primitive_db import connect, core
+from src.primitive_db.stats import plan_where
+from src.primitive_db.utils import export_rows, load_table_data
+
+create_table = unwrap(core.create_table)
+insert = unwrap(core.insert)
+select = unwrap(core.select)
+update = unwrap(core.update)
+delete = unwrap(core.delete)
+vacuum = unwrap(core.vacuum)
+
+
+def _table(n):
+    metadata = {"tables": {}}
+    create_table(metadata, "t", ["n:int", "s:str"])
+    data = []
+    for i in range(1, n + 1):
+        insert(metadata, "t", [i % 3, f"v{i}"], data)
+    return metadata, data
+
+
+def _ids(rows):
+    return [rec["ID"] for rec in rows]
+
+
+def test_delete_leaves_tombstones():
+    metadata, data = _table(6)
+
+    _, deleted = delete(metadata, "t", data, {"n": 0})
+
+    assert deleted == [3, 6]
+    assert len(data) == 6
+    assert data[2] == {"ID": 3, core.TOMBSTONE: True}
+    assert metadata["tables"]["t"]["dead_rows"] == 2
+    assert metadata["tables"]["t"]["stats"]["row_count"] == 4
+    assert core.table_info(metadata, "t", data) == ("ID:int, n:int, s:str", 4)
+
+
+def test_tombstones_are_skipped_by_reads_and_writes(tmp_path):
+    metadata, data = _table(6)
+    stats = metadata["tables"]["t"]["stats"]
+    delete(metadata, "t", data, {"ID": 2})
+
+    assert _ids(select(data)) == [1, 3, 4, 5, 6]
+    assert select(data, {"ID": 2}, stats) == []
+    assert _ids(core.iter_select(iter(data), {"n": 2}, None)) == [5]
+    assert _ids(core.iter_select(data, None, stats, ("s", True), 2)) == [6, 5]
+
+    assert update(metadata, "t", data, {"s": "x"}, {"ID": 2})[1] == []
+    assert update(metadata, "t", data, {"s": "x"}, {"n": 2})[1] == [5]
+    assert delete(metadata, "t", data, {"ID": 2})[1] == []
+    assert data[1] == {"ID": 2, core.TOMBSTONE: True}
+
+    path = tmp_path / "out.jsonl"
+    count = export_rows(str(path), core.iter_select(data), ["ID", "n", "s"])
+    lines = path.read_text("utf-8").splitlines()
+    assert count == len(lines) == 5
+    assert [json.loads(line)["ID"] for line in lines] == [1, 3, 4, 5, 6]
+
+
+def test_insert_after_deleting_last_row_keeps_ids_growing():
+    metadata, data = _table(3)
+    delete(metadata, "t", data, {"ID": 3})
+
+    _, new_id = insert(metadata, "t", [1, "new"], data)
+
+    assert new_id == 4
+
+
+@pytest.mark.parametrize(
+    ("rows", "dead", "expected"),
+    [(200, 99, False), (400, 100, False), (333, 100, True), (100, 100, True)],
+)
+def test_needs_vacuum_threshold(rows, dead, expected):
+    metadata, data = _table(1)
+    metadata["tables"]["t"]["dead_rows"] = dead
+
+    assert core.needs_vacuum(metadata, "t", [data[0]] * rows) is expected
+
+
+def test_vacuum_removes_tombstones():
+    metadata, data = _table(10)
+    delete(metadata, "t", data, {"n": 1})
+
+    live, removed = vacuum(metadata, "t", data)
+
+    assert removed == 4
+    assert _ids(live) == [2, 3, 5, 6, 8, 9]
+    assert metadata["tables"]["t"]["dead_rows"] == 0
+    assert metadata["tables"]["t"]["stats"]["stored_rows"] == 6
+    assert core.table_info(metadata, "t", live)[1] == 6
+    # Статистика по-прежнему считается точной: пустой результат без просмотра.
+    plan = plan_where(metadata["tables"]["t"]["stats"], {"n": 7}, len(live))
+    assert plan["path"] == "empty"
+
+
+def test_api_auto_vacuum_at_threshold(tmp_path):
+    path = str(tmp_path / "db")
+    data_dir = os.path.join(path, "data")
+    with connect(path) as conn:
+        conn.execute("create_table t n:int")
+        conn.executemany("insert into t values (?)", [(i,) for i in range(300)])
+
+    with connect(path) as conn:
+        conn.executemany("delete from t where n = ?", [(i,) for i in range(99)])
+    assert len(load_table_data("t", data_dir)) == 300
+
+    with connect(path) as conn:
+        assert conn.execute("delete from t where n = ?", (99,)).rowcount == 1
+    assert len(load_table_data("t", data_dir)) == 200
+
+    conn = connect(path)
+    assert conn.metadata["tables"]["t"]["dead_rows"] == 0
+    assert conn.execute("vacuum t").rowcount == 0
+    assert len(conn.execute("select from t").fetchall()) == 200